@@ -4,18 +4,24 @@ import json
 import logging
 import typing
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import rich.console
-
-from backupcrawl.printer import ConsoleResultPrinter, JsonResultPrinter
+from backupcrawl.census import default_census_path
+from backupcrawl.printer import JsonResultPrinter
 from backupcrawl.statustracker import TimingStatusTracker
 from . import crawler
 
+if TYPE_CHECKING:
+    import rich.console
+
 MODULE_LOGGER = logging.getLogger("backupcrawl.main")
 
 
-console = rich.console.Console()
+def _make_console() -> "rich.console.Console":
+    """Create the console, only needed for the progress display and console output"""
+    import rich.console  # pylint: disable=C0415,W0621
+
+    return rich.console.Console()
 
 
 def _parse_rc(path: Path) -> dict[str, Any]:
@@ -31,7 +37,7 @@ def _parse_rc(path: Path) -> dict[str, Any]:
 def main() -> None:
     """Main function"""
     parser = argparse.ArgumentParser(description="Search for non-backed up files")
-    parser.add_argument("path", type=Path, default=Path("/"))
+    parser.add_argument("path", type=Path, nargs="+", default=[Path("/")])
     parser.add_argument("--verbose", "-v", action="count", default=0)
     parser.add_argument(
         "--rcfile", type=Path, default=Path.home() / ".config" / "backupcrawlrc.json"
@@ -43,6 +49,12 @@ def main() -> None:
         help="Show all file paths, also backed up ones",
     )
     parser.add_argument("--progress", "-p", action="store_true")
+    parser.add_argument(
+        "--census",
+        type=Path,
+        default=default_census_path(),
+        help="Entry counts of previous crawls, used to estimate progress",
+    )
     parser.add_argument("--ignore", "-i", action="append", default=[])
     parser.add_argument(
         "--format", "-f", choices=["json", "console"], default="console"
@@ -54,16 +66,27 @@ def main() -> None:
         "WARNING" if args.verbose == 0 else "INFO" if args.verbose == 1 else "DEBUG"
     )
     config = _parse_rc(args.rcfile)
-    crawl_result = crawler.scan(
+    console = _make_console() if args.progress or args.format != "json" else None
+    crawl_results = crawler.scan(
         args.path,
         ignore_paths=config.get("ignore_paths", []) + args.ignore,
-        status=(TimingStatusTracker(args.path, console) if args.progress else None),
+        status=(
+            TimingStatusTracker(console, args.census)
+            if args.progress and console is not None
+            else None
+        ),
+        prefetch=True,
     )
+    crawl_result = crawl_results.merged()
     if args.format == "json":
         JsonResultPrinter().print(crawl_result, show_clean=args.all)
     else:
+        # pylint: disable-next=C0415
+        from backupcrawl.console_printer import ConsoleResultPrinter
+
         if args.format != "console":
             print("Unknown output format")
+        assert console is not None
         ConsoleResultPrinter(console).print(crawl_result, show_clean=args.all)
 
 
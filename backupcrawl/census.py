@@ -0,0 +1,70 @@
+"""Contains the census of subtree sizes from previous crawls"""
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+MODULE_LOGGER = logging.getLogger("backupcrawl.census")
+
+# Subtrees deeper below a crawled root are not recorded
+CENSUS_DEPTH = 3
+
+
+@dataclass
+class CensusEntry:
+    """Size of a subtree when it was last crawled"""
+
+    entries: int
+    duration_ms: int
+
+
+Census = dict[str, CensusEntry]
+
+
+def default_census_path() -> Path:
+    """Location of the census in the user cache directory"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "backupcrawl" / "census.json"
+
+
+def load_census(path: Path) -> Census:
+    """Load census, an unreadable census is treated as empty"""
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as census_file:
+            raw_census = json.load(census_file)
+        return {subtree: CensusEntry(**entry) for subtree, entry in raw_census.items()}
+    except (OSError, ValueError, TypeError, AttributeError) as load_error:
+        MODULE_LOGGER.warning("Could not load census %s: %s", path, load_error)
+        return {}
+
+
+def update_census(path: Path, census: Census, roots: list[Path]) -> None:
+    """Store census, replacing all previous entries below the crawled roots"""
+    absolute_roots = [root.absolute() for root in roots]
+    updated_census = {
+        subtree: entry
+        for subtree, entry in load_census(path).items()
+        if not any(Path(subtree).is_relative_to(x) for x in absolute_roots)
+    }
+    updated_census.update(census)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temporary file, concurrent runs must not write into the same one
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+        ) as census_file:
+            json.dump(
+                {subtree: asdict(entry) for subtree, entry in updated_census.items()},
+                census_file,
+            )
+        try:
+            os.replace(census_file.name, path)
+        except OSError:
+            os.unlink(census_file.name)
+            raise
+    except OSError as store_error:
+        MODULE_LOGGER.warning("Could not store census %s: %s", path, store_error)
@@ -2,10 +2,13 @@
 
 import logging
 import os
+import threading
+import typing
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from fnmatch import fnmatch
 from pathlib import Path
 
-from .crawlresult import CrawlResult
+from .crawlresult import CrawlAccumulator, CrawlResult, DirKey, MultiCrawlResult
 from .git_check import GitDirChecker
 from .pacman_check import PacmanFileChecker
 from .statustracker import StatusTracker, VoidStatusTracker
@@ -15,6 +18,112 @@ from .sync_status import BackupEntry, DirChecker, FileChecker, SyncStatus
 MODULE_LOGGER = logging.getLogger("backupcrawl.crawler")
 
 
+class _LazyChecks:
+    """Checkers shared by all crawled roots, each list is only constructed once it is needed"""
+
+    def __init__(
+        self,
+        dir_check_types: list[type[DirChecker]],
+        file_check_types: list[type[FileChecker]],
+    ) -> None:
+        self._dir_check_types = dir_check_types
+        self._file_check_types = file_check_types
+        self._dir_checks: list[DirChecker] | None = None
+        self._file_checks: list[FileChecker] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def dir_checks(self) -> list[DirChecker]:
+        """Checkers for directories"""
+        if self._dir_checks is None:
+            with self._lock:
+                if self._dir_checks is None:
+                    MODULE_LOGGER.debug("Initializing directory checkers")
+                    self._dir_checks = [x() for x in self._dir_check_types]
+        return self._dir_checks
+
+    @property
+    def file_checks(self) -> list[FileChecker]:
+        """Checkers for files"""
+        if self._file_checks is None:
+            with self._lock:
+                if self._file_checks is None:
+                    MODULE_LOGGER.debug("Initializing file checkers")
+                    self._file_checks = [x() for x in self._file_check_types]
+        return self._file_checks
+
+    def prefetch(self, status: StatusTracker) -> None:
+        """Construct all checkers and let them load their data in the background"""
+        for dir_check in self.dir_checks:
+            dir_check.prefetch(status)
+        for file_check in self.file_checks:
+            file_check.prefetch(status)
+
+    def close(self) -> None:
+        """Stop background work of all checkers which were constructed"""
+        for dir_check in self._dir_checks or []:
+            dir_check.close()
+        for file_check in self._file_checks or []:
+            file_check.close()
+
+
+class _VisitedDirectories:
+    """Directories already crawled by any root, keyed by device and inode
+
+    The first crawl reaching a directory crawls it. Which one that is depends on
+    thread timing, so once all crawls are done, directories are moved to the root
+    earliest in the root order, as if the roots had been crawled one by one."""
+
+    def __init__(self, accumulators: list[CrawlAccumulator]) -> None:
+        self._accumulators = accumulators
+        self._root_order = {x: index for index, x in enumerate(accumulators)}
+        # Root index and node of the crawl owning the directory
+        self._owners: dict[DirKey, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def visit(self, key: DirKey, result: CrawlAccumulator, node: int) -> bool:
+        """Claim directory for crawling, returns `False` if it is crawled elsewhere"""
+        owner = (self._root_order[result], node)
+        with self._lock:
+            return self._owners.setdefault(key, owner) is owner
+
+    def _settle_alias(self) -> bool:
+        """Move one directory reached earlier in root order than it was crawled"""
+        for root_index, result in enumerate(self._accumulators):
+            for node, key in result.aliases:
+                owner_index, owner_node = self._owners[key]
+                owner = self._accumulators[owner_index]
+                if (root_index, result.order_key(node)) >= (
+                    owner_index,
+                    owner.order_key(owner_node),
+                ):
+                    continue
+                moved = result.graft(node, key, owner, owner_node)
+                self._owners.update(
+                    {
+                        moved_key: (root_index, moved[x[1]])
+                        for moved_key, x in self._owners.items()
+                        if x[0] == owner_index and x[1] in moved
+                    }
+                )
+                return True
+        return False
+
+    def settle(self) -> None:
+        """Move every directory to the first root and path reaching it in crawl order"""
+        while self._settle_alias():
+            pass
+
+    def path(self, key: DirKey) -> Path:
+        """Path of the crawl owning the directory"""
+        root_index, node = self._owners[key]
+        return self._accumulators[root_index].path(node)
+
+
+# Files of a root waiting for their check, with directory node and file node
+_PendingFiles = list[tuple[int, int, Path]]
+
+
 def _check_file(path: Path, file_checks: list[FileChecker]) -> BackupEntry:
     for check in file_checks:
         status = check.check_file(path)
@@ -31,36 +140,62 @@ def _check_directory(path: Path, dir_checks: list[DirChecker]) -> BackupEntry:
     return BackupEntry(path, SyncStatus.NONE)
 
 
+def _check_files(
+    pending: _PendingFiles,
+    file_checks: list[FileChecker],
+    status: StatusTracker,
+    result: CrawlAccumulator,
+) -> None:
+    """Check the pending files in the order they were found"""
+    for node, file_node, vcs_file in pending:
+        backup_result = _check_file(vcs_file, file_checks)
+        if backup_result.status == SyncStatus.NONE:
+            result.add_loose(file_node)
+        else:
+            result.add_backup(node, backup_result)
+        status.close_path(vcs_file)
+    pending.clear()
+
+
 def _filter_directory(
     root: Path,
+    node: int,
     ignore_paths: list[str],
-    result: CrawlResult,
-) -> tuple[list[Path], list[Path]]:
+    result: CrawlAccumulator,
+) -> tuple[list[Path], dict[Path, DirKey]]:
     found_files: list[Path] = []
-    recurse_dirs: list[Path] = []
+    recurse_dirs: dict[Path, DirKey] = {}
 
-    def is_ignored(check_path: Path) -> bool:
+    def is_ignored(check_path: str) -> bool:
         return any(
-            fnmatch(str(check_path), os.path.expanduser(cur_pattern))
+            fnmatch(check_path, os.path.expanduser(cur_pattern))
             for cur_pattern in ignore_paths
         )
 
-    filtered_paths = (x for x in root.iterdir() if not is_ignored(x))
-    non_symlinks = (x for x in filtered_paths if not x.is_symlink())
-    for current_path in non_symlinks:
-        if current_path.is_file():
-            if not os.access(current_path, os.R_OK):
-                result.denied_paths.append(current_path)
+    with os.scandir(root) as entries:
+        # Matched like `Path`, scandir keeps a leading "./" for the root "."
+        entry_paths = [(Path(x.path), x) for x in entries]
+    filtered_entries = [x for x in entry_paths if not is_ignored(str(x[0]))]
+    non_symlinks = (x for x in filtered_entries if not x[1].is_symlink())
+    for entry_path, current_entry in non_symlinks:
+        if current_entry.is_file():
+            if not os.access(current_entry.path, os.R_OK):
+                result.add_denied(result.add_node(node, current_entry.name))
                 continue
 
-            found_files.append(current_path)
+            found_files.append(entry_path)
 
-        elif current_path.is_dir():
-            if not os.access(current_path, os.R_OK | os.X_OK):
-                result.denied_paths.append(current_path)
+        elif current_entry.is_dir():
+            if not os.access(current_entry.path, os.R_OK | os.X_OK):
+                result.add_denied(result.add_node(node, current_entry.name))
                 continue
 
-            recurse_dirs.append(current_path)
+            # Not the inode from the directory listing, it differs for mount points
+            entry_stat = current_entry.stat(follow_symlinks=False)
+            recurse_dirs[entry_path] = (
+                entry_stat.st_dev,
+                entry_stat.st_ino,
+            )
         else:
             # If path is not a directory, or a file,
             # it is some socket or pipe. We don't care
@@ -70,56 +205,183 @@ def _filter_directory(
 
 def _dir_crawl(
     root: Path,
+    node: int,
+    key: DirKey,
     ignore_paths: list[str],
     status: StatusTracker,
-    checks: tuple[list[DirChecker], list[FileChecker]],
-) -> CrawlResult:
+    checks: tuple[_LazyChecks, _VisitedDirectories, threading.Event, _PendingFiles],
+    result: CrawlAccumulator,
+) -> None:
     """Iterates depth first looking for git repositories"""
+    if checks[2].is_set():
+        # Another root failed or the scan was interrupted, the result is discarded
+        return
     MODULE_LOGGER.debug("Entering %s", root)
-    result = CrawlResult(root)
     status.current_path(root)
 
-    backup_result = _check_directory(root, checks[0])
+    if not checks[1].visit(key, result, node):
+        MODULE_LOGGER.info("%s is crawled under another path", root)
+        result.add_alias(node, key)
+        return
+
+    backup_result = _check_directory(root, checks[0].dir_checks)
     if backup_result.status != SyncStatus.NONE:
-        result.add_backup(backup_result)
-        return result
+        result.add_backup(node, backup_result)
+        return
 
-    (found_files, recurse_dirs) = _filter_directory(root, ignore_paths, result)
+    (found_files, recurse_dirs) = _filter_directory(root, node, ignore_paths, result)
 
-    status.open_paths(recurse_dirs)
+    status.open_paths(list(recurse_dirs))
     status.open_paths(found_files)
 
-    for vcs_file in found_files:
-        backup_result = _check_file(vcs_file, checks[1])
-        if backup_result.status == SyncStatus.NONE:
-            result.loose_paths.append(backup_result.path)
-        else:
-            result.add_backup(backup_result)
-        status.close_path(vcs_file)
+    # While a file checker is still loading, keep crawling and check files later
+    checks[3].extend((node, result.add_node(node, x.name), x) for x in found_files)
+    if checks[3] and all(x.ready() for x in checks[0].file_checks):
+        _check_files(checks[3], checks[0].file_checks, status, result)
 
-    for recurse_dir in recurse_dirs:
-        result.extend(_dir_crawl(recurse_dir, ignore_paths, status, checks))
+    for recurse_dir, recurse_key in recurse_dirs.items():
+        _dir_crawl(
+            recurse_dir,
+            result.add_node(node, recurse_dir.name),
+            recurse_key,
+            ignore_paths,
+            status,
+            checks,
+            result,
+        )
         status.close_path(recurse_dir)
 
-    return result
 
+def _crawl_root(
+    result: CrawlAccumulator,
+    ignore_paths: list[str],
+    status: StatusTracker,
+    checks: tuple[_LazyChecks, _VisitedDirectories, threading.Event],
+) -> None:
+    """Crawl a single root into its own accumulator"""
+    root_stat = result.root.stat()
+    pending: _PendingFiles = []
+    _dir_crawl(
+        result.root,
+        CrawlAccumulator.ROOT,
+        (root_stat.st_dev, root_stat.st_ino),
+        ignore_paths,
+        status,
+        (*checks, pending),
+        result,
+    )
+    if pending and not checks[2].is_set():
+        _check_files(pending, checks[0].file_checks, status, result)
+
+
+def _crawl_concurrently(
+    accumulators: list[CrawlAccumulator],
+    ignore_paths: list[str],
+    status: StatusTracker,
+    checks: tuple[_LazyChecks, _VisitedDirectories, threading.Event],
+) -> None:
+    """Crawl each root in its own thread, stopping all of them if one fails"""
+    with ThreadPoolExecutor(max_workers=max(len(accumulators), 1)) as executor:
+        crawl_futures = [
+            executor.submit(_crawl_root, x, ignore_paths, status, checks)
+            for x in accumulators
+        ]
+        try:
+            finished, _ = wait(crawl_futures, return_when=FIRST_EXCEPTION)
+            # Raise a failure right away, instead of waiting for roots before it
+            for crawl_future in [*finished, *crawl_futures]:
+                crawl_future.result()
+        except BaseException:
+            checks[2].set()
+            raise
 
+
+def _deduplicate_roots(roots: list[Path]) -> tuple[list[Path], dict[Path, Path]]:
+    """Split roots into the ones to crawl, and the ones covered by another root"""
+    by_depth = sorted(roots, key=lambda x: len(x.resolve().parts))
+    kept: dict[Path, Path] = {}
+    covered: dict[Path, Path] = {}
+    for root in by_depth:
+        resolved_root = root.resolve()
+        covering_root = next(
+            (kept[x] for x in kept if resolved_root.is_relative_to(x)), None
+        )
+        if covering_root is not None:
+            if covering_root != root:
+                MODULE_LOGGER.info(
+                    "Skipping %s, it is covered by %s", root, covering_root
+                )
+                covered[root] = covering_root
+            continue
+        kept[resolved_root] = root
+    kept_roots = set(kept.values())
+    return ([root for root in dict.fromkeys(roots) if root in kept_roots], covered)
+
+
+@typing.overload
 def scan(
     root: Path,
     ignore_paths: list[str] | None = None,
     status: StatusTracker | None = None,
+    prefetch: bool = False,
 ) -> CrawlResult:
-    """Scan the given path for files that are not backed up"""
+    ...
+
+
+@typing.overload
+def scan(
+    root: list[Path],
+    ignore_paths: list[str] | None = None,
+    status: StatusTracker | None = None,
+    prefetch: bool = False,
+) -> MultiCrawlResult:
+    ...
+
+
+def scan(
+    root: Path | list[Path],
+    ignore_paths: list[str] | None = None,
+    status: StatusTracker | None = None,
+    prefetch: bool = False,
+) -> CrawlResult | MultiCrawlResult:
+    """Scan the given paths for files that are not backed up
+
+    Multiple roots are crawled concurrently and share their checkers.
+    Roots contained in another root are only crawled as part of that root, they
+    get no entry in `results`, but are listed in `covered_roots` instead.
+
+    With `prefetch`, all checkers start loading their data right away, instead of
+    once the crawl first needs it."""
+    if isinstance(root, Path):
+        return scan([root], ignore_paths, status, prefetch).results[root]
     if ignore_paths is None:
         ignore_paths = []
     if status is None:
-        status = VoidStatusTracker(root)
+        status = VoidStatusTracker()
+    roots, covered_roots = _deduplicate_roots(root)
+    status.crawl_roots(roots)
+    accumulators = [CrawlAccumulator(x) for x in roots]
+    checks = (
+        _LazyChecks([GitDirChecker], [PacmanFileChecker]),
+        _VisitedDirectories(accumulators),
+        threading.Event(),
+    )
     with status as entered_status:
-        crawl_result = _dir_crawl(
-            root,
-            ignore_paths,
-            entered_status,
-            ([GitDirChecker()], [PacmanFileChecker()]),
-        )
+        try:
+            if prefetch:
+                checks[0].prefetch(entered_status)
+            if len(accumulators) == 1:
+                # On the calling thread, so an interrupt stops the crawl right away
+                _crawl_root(accumulators[0], ignore_paths, entered_status, checks)
+            else:
+                _crawl_concurrently(accumulators, ignore_paths, entered_status, checks)
+        finally:
+            # Crawls are finished here, so no checker is used after closing it
+            checks[0].close()
 
+    checks[1].settle()
+    crawl_result = MultiCrawlResult(
+        {x.root: x.result(checks[1].path) for x in accumulators},
+        covered_roots,
+    )
     return crawl_result
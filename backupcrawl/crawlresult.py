@@ -1,11 +1,20 @@
 """Contains CrawlResult class"""
+
+from __future__ import annotations
+
+import os
 from collections import defaultdict
 from pathlib import Path
-
-from typing_extensions import Self
+from typing import TYPE_CHECKING, Callable
 
 from .sync_status import BackupEntry
 
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+# Device and inode number identifying a directory
+DirKey = tuple[int, int]
+
 
 class CrawlResult:
     """Result from crawl of a single directory"""
@@ -14,6 +23,8 @@ class CrawlResult:
         self.loose_paths: list[Path] = []
         self.denied_paths: list[Path] = []
         self.backups: defaultdict[type[BackupEntry], list[BackupEntry]] = defaultdict(list)
+        # Directories which are the same as an already crawled one, with that one
+        self.aliases: list[tuple[Path, Path]] = []
         self.path: Path = path
 
     def add_backup(self, backup: BackupEntry) -> None:
@@ -27,9 +38,204 @@ class CrawlResult:
             self.backups[backup_type].extend(other.backups[backup_type])
 
         self.denied_paths.extend(other.denied_paths)
+        self.aliases.extend(other.aliases)
 
         # If `other` has no backed up paths, we can just mark the entire tree as not backed up
         if other.backups:
             self.loose_paths.extend(other.loose_paths)
         elif other.loose_paths:
             self.loose_paths.append(other.path)
+
+
+class CrawlAccumulator:
+    """Collects the result of a crawl below a single root
+
+    Paths are stored as indices into a parent pointer table, node 0 being the root.
+    Instead of copying results up the tree, directories containing backups are
+    marked, and loose subtrees are collapsed once the result is built.
+
+    Nodes are created in crawl order, so their indices order the entries. Nodes
+    grafted from another crawl are ordered by the alias they replaced instead.
+    Entries added out of that order are sorted once the result is built."""
+
+    ROOT = 0
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._parents: list[int] = [-1]
+        self._names: list[str] = [""]
+        self._has_backup = bytearray(1)
+        self._loose: list[int] = []
+        self._denied: list[int] = []
+        self._aliases: list[tuple[int, DirKey]] = []
+        self._backups: list[tuple[int, BackupEntry]] = []
+        # Crawl order of grafted nodes
+        self._order: dict[int, tuple[int, ...]] = {}
+        self._unordered = False
+
+    def add_node(self, parent: int, name: str) -> int:
+        """Add a path below the `parent` node, returns the new node"""
+        self._parents.append(parent)
+        self._names.append(name)
+        self._has_backup.append(0)
+        return len(self._parents) - 1
+
+    def _mark_backup(self, node: int) -> None:
+        """Mark node and its ancestors as containing backups"""
+        while node != -1 and not self._has_backup[node]:
+            self._has_backup[node] = 1
+            node = self._parents[node]
+
+    def add_loose(self, node: int) -> None:
+        """Mark node as not backed up"""
+        if self._loose and node < self._loose[-1]:
+            self._unordered = True
+        self._loose.append(node)
+
+    def add_denied(self, node: int) -> None:
+        """Mark node as not accessible"""
+        self._denied.append(node)
+
+    def add_backup(self, node: int, backup: BackupEntry) -> None:
+        """Add backup entry, located in or at the directory `node`"""
+        if self._backups and node < self._backups[-1][0]:
+            self._unordered = True
+        self._backups.append((node, backup))
+        self._mark_backup(node)
+
+    def add_alias(self, node: int, key: DirKey) -> None:
+        """Mark directory node as the directory `key`, which is crawled elsewhere
+
+        The results of the directory are reported under the other path, so the
+        subtrees containing the alias are not collapsed either."""
+        self._aliases.append((node, key))
+        self._mark_backup(node)
+
+    @property
+    def aliases(self) -> list[tuple[int, DirKey]]:
+        """Alias directory nodes, with the directory they are"""
+        return list(self._aliases)
+
+    def order_key(self, node: int) -> tuple[int, ...]:
+        """Position of the node in crawl order"""
+        return self._order.get(node, (node,))
+
+    def graft(
+        self, node: int, key: DirKey, other: CrawlAccumulator, other_node: int
+    ) -> dict[int, int]:
+        """Move the directory `key` crawled at `other_node` of `other` to the alias `node`
+
+        The directory becomes an alias in `other` instead. Returns the new node of
+        every moved node, `other` may be this accumulator."""
+        moved = {other_node: node}
+        base = self.order_key(node)
+        for other_index in range(other_node + 1, len(other._parents)):
+            parent = moved.get(other._parents[other_index])
+            if parent is None:
+                continue
+            new_node = self.add_node(parent, other._names[other_index])
+            self._order[new_node] = base + other.order_key(other_index)
+            moved[other_index] = new_node
+
+        loose = [moved[x] for x in other._loose if x in moved]
+        denied = [moved[x] for x in other._denied if x in moved]
+        aliases = [(moved[x], y) for x, y in other._aliases if x in moved]
+        backups = [(moved[x], y) for x, y in other._backups if x in moved]
+        other._loose = [x for x in other._loose if x not in moved]
+        other._denied = [x for x in other._denied if x not in moved]
+        other._aliases = [x for x in other._aliases if x[0] not in moved]
+        other._backups = [x for x in other._backups if x[0] not in moved]
+        other._aliases.append((other_node, key))
+        other._unordered = True
+
+        self._aliases.remove((node, key))
+        self._loose.extend(loose)
+        self._denied.extend(denied)
+        self._aliases.extend(aliases)
+        self._backups.extend(backups)
+        self._unordered = True
+        return moved
+
+    def path(self, node: int) -> Path:
+        """Full path of the given node"""
+        names: list[str] = []
+        while node != self.ROOT:
+            names.append(self._names[node])
+            node = self._parents[node]
+        return self.root.joinpath(*reversed(names))
+
+    def _collapse_target(self, node: int, targets: dict[int, int]) -> int:
+        """Topmost ancestor of `node` without backups in its subtree, or `node` itself"""
+        chain: list[int] = []
+        target = node
+        current = self._parents[node]
+        while current > self.ROOT and not self._has_backup[current]:
+            if current in targets:
+                target = targets[current]
+                break
+            chain.append(current)
+            target = current
+            current = self._parents[current]
+        for chain_node in chain:
+            targets[chain_node] = target
+        return target
+
+    def _reorder(self) -> None:
+        """Restore crawl order and backup marks after entries were moved"""
+        self._loose.sort(key=self.order_key)
+        self._denied.sort(key=self.order_key)
+        self._aliases.sort(key=lambda x: self.order_key(x[0]))
+        self._backups.sort(key=lambda x: self.order_key(x[0]))
+        self._has_backup = bytearray(len(self._parents))
+        for node, _ in self._backups:
+            self._mark_backup(node)
+        for node, _ in self._aliases:
+            self._mark_backup(node)
+        self._unordered = False
+
+    def result(self, key_path: Callable[[DirKey], Path]) -> CrawlResult:
+        """Build the crawl result of the root, `key_path` locates aliased directories"""
+        if self._unordered:
+            self._reorder()
+        result = CrawlResult(self.root)
+        targets: dict[int, int] = {}
+        loose_nodes = dict.fromkeys(
+            self._collapse_target(node, targets) for node in self._loose
+        )
+        result.loose_paths = [self.path(node) for node in loose_nodes]
+        result.denied_paths = [self.path(node) for node in self._denied]
+        result.aliases = [
+            (self.path(node), key_path(key)) for node, key in self._aliases
+        ]
+        for _, backup in self._backups:
+            result.add_backup(backup)
+        return result
+
+
+class MultiCrawlResult:
+    """Results from crawls of several root directories"""
+
+    def __init__(
+        self,
+        results: dict[Path, CrawlResult],
+        covered_roots: dict[Path, Path] | None = None,
+    ) -> None:
+        self.results = results
+        # Roots which were crawled as part of another root, with that root
+        self.covered_roots = covered_roots if covered_roots is not None else {}
+
+    def merged(self) -> CrawlResult:
+        """Combine the results of all roots into a single result"""
+        common_root = (
+            Path(os.path.commonpath([x.absolute() for x in self.results]))
+            if self.results
+            else Path("/")
+        )
+        result = CrawlResult(common_root)
+        for root_result in self.results.values():
+            for backup_type in root_result.backups:
+                result.backups[backup_type].extend(root_result.backups[backup_type])
+            result.denied_paths.extend(root_result.denied_paths)
+            result.aliases.extend(root_result.aliases)
+            result.loose_paths.extend(root_result.loose_paths)
+        return result
@@ -1,12 +1,21 @@
 """Pacman check"""
+from __future__ import annotations
+
+import contextlib
 import itertools
 import logging
 import subprocess
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
 from .sync_status import BackupEntry, FileChecker, SyncStatus
 
+if TYPE_CHECKING:
+    from .statustracker import StatusTracker
+
 MODULE_LOGGER = logging.getLogger("backupcrawl.pacman_check")
 
 
@@ -22,27 +31,130 @@ class PacmanBackupEntry(BackupEntry):  # pylint: disable=R0903
         return "Pacman"
 
 
+class _PacmanLoad:
+    """A pacman query running in the background, parsed once it finished"""
+
+    def __init__(
+        self,
+        arguments: list[str],
+        parse: Callable[[subprocess.CompletedProcess[str]], dict[str, str]],
+        status: StatusTracker | None,
+    ) -> None:
+        self.name = " ".join(["pacman", *arguments])
+        self._loaded: Future[dict[str, str]] = Future()
+        self._thread: threading.Thread | None = None
+        self._terminated = False
+        MODULE_LOGGER.debug("Loading %s", self.name)
+        try:
+            self._process = subprocess.Popen(
+                ["pacman", *arguments],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        except OSError as start_error:
+            self._loaded.set_exception(start_error)
+            return
+        self._thread = threading.Thread(
+            target=self._load, args=(parse, status), name=self.name
+        )
+        self._thread.start()
+
+    def _load(
+        self,
+        parse: Callable[[subprocess.CompletedProcess[str]], dict[str, str]],
+        status: StatusTracker | None,
+    ) -> None:
+        with status.track_load(self.name) if status else contextlib.nullcontext():
+            try:
+                stdout, stderr = self._process.communicate()
+                if self._terminated:
+                    # Output was cut off by `close`, nobody waits for it anymore
+                    self._loaded.cancel()
+                    return
+                self._loaded.set_result(
+                    parse(
+                        subprocess.CompletedProcess(
+                            self._process.args, self._process.returncode, stdout, stderr
+                        )
+                    )
+                )
+            except Exception as load_error:  # pylint: disable=W0718
+                self._loaded.set_exception(load_error)
+
+    def done(self) -> bool:
+        """Whether the query finished, so `result` does not block"""
+        return self._loaded.done()
+
+    def result(self) -> dict[str, str]:
+        """Wait for the query to finish, returns the parsed output"""
+        return self._loaded.result()
+
+    def close(self) -> None:
+        """Terminate the query if it is still running, and reap it"""
+        if self._thread is None:
+            return
+        if self._process.poll() is None:
+            MODULE_LOGGER.debug("Terminating %s", self.name)
+            self._terminated = True
+            self._process.terminate()
+        self._thread.join()
+
+
 class PacmanFileChecker(FileChecker):
     """Check if given path is installed with pacman"""
 
     def __init__(self) -> None:
-        self._file_dict: dict[str, str] | None = None
-        self._dirty_file_dict: dict[str, str] | None = None
+        self._file_dict: _PacmanLoad | None = None
+        self._dirty_file_dict: _PacmanLoad | None = None
         self.unknown_reasons: list[str] = []
+        # Shared between concurrently crawled roots, so each dict is only loaded once
+        self._load_lock = threading.Lock()
+
+    def _get_file_dict(self, status: StatusTracker | None = None) -> _PacmanLoad:
+        with self._load_lock:
+            if self._file_dict is None:
+                self._file_dict = _PacmanLoad(["-Ql"], self._parse_pacman_dict, status)
+            return self._file_dict
+
+    def _get_dirty_file_dict(self, status: StatusTracker | None = None) -> _PacmanLoad:
+        with self._load_lock:
+            if self._dirty_file_dict is None:
+                self._dirty_file_dict = _PacmanLoad(
+                    ["-Qkk"], self._parse_dirty_pacman_dict, status
+                )
+            return self._dirty_file_dict
+
+    def prefetch(self, status: StatusTracker) -> None:
+        """Start loading the pacman databases in the background"""
+        self._get_file_dict(status)
+        self._get_dirty_file_dict(status)
+
+    def close(self) -> None:
+        """Stop pacman queries which are still running"""
+        with self._load_lock:
+            loads = [self._file_dict, self._dirty_file_dict]
+            self._file_dict = None
+            self._dirty_file_dict = None
+        for load in loads:
+            if load is not None:
+                load.close()
+
+    def ready(self) -> bool:
+        """Whether the list of pacman files is loaded, starts loading it otherwise"""
+        return self._get_file_dict().done()
 
     def _pacman_differs(self, filepath: Path) -> SyncStatus:
         """Check if a pacman controlled file is clean"""
-        if self._dirty_file_dict is None:
-            MODULE_LOGGER.debug("Initializing dirty pacman files")
-            self._dirty_file_dict = self._get_dirty_pacman_dict()
-        if str(filepath) in self._dirty_file_dict:
+        if str(filepath) in self._get_dirty_file_dict().result():
             return SyncStatus.DIRTY
         return SyncStatus.CLEAN
 
-    def _get_pacman_dict(self) -> dict[str, str]:
-        pacman_process = subprocess.run(
-            ["pacman", "-Ql"], capture_output=True, text=True, check=True
-        )
+    @staticmethod
+    def _parse_pacman_dict(
+        pacman_process: subprocess.CompletedProcess[str],
+    ) -> dict[str, str]:
+        pacman_process.check_returncode()
 
         result = {
             path: package
@@ -52,10 +164,9 @@ class PacmanFileChecker(FileChecker):
         }
         return result
 
-    def _get_dirty_pacman_dict(self) -> dict[str, str]:
-        pacman_process = subprocess.run(
-            ["pacman", "-Qkk"], capture_output=True, text=True, check=False
-        )
+    def _parse_dirty_pacman_dict(
+        self, pacman_process: subprocess.CompletedProcess[str]
+    ) -> dict[str, str]:
         lines = (
             line
             for line in itertools.chain(
@@ -94,10 +205,8 @@ class PacmanFileChecker(FileChecker):
 
     def check_file(self, filepath: Path) -> PacmanBackupEntry:
         """Checks if a single file is managed by pacman, returns the package"""
-        if self._file_dict is None:
-            self._file_dict = self._get_pacman_dict()
         try:
-            pacman_pkg = self._file_dict[str(filepath)]
+            pacman_pkg = self._get_file_dict().result()[str(filepath)]
         except KeyError:
             return PacmanBackupEntry(path=filepath, status=SyncStatus.NONE)
         MODULE_LOGGER.debug("Calling pacfile command on %s", str(filepath))
@@ -0,0 +1,114 @@
+"""Contains PathTrackerDisplay class"""
+import time
+
+import rich.console
+import rich.live
+import rich.markup
+import rich.progress
+import rich.progress_bar
+import rich.table
+import rich.text
+
+from .statustracker import LoadTracker, PathTracker
+
+
+class PathTrackerDisplay(rich.live.Live):
+    """Progress display for crawling in directories using one `PathTracker` per root"""
+
+    def __init__(
+        self,
+        path_trackers: list[PathTracker],
+        load_tracker: LoadTracker,
+        console: rich.console.Console,
+    ):
+        self.progress_bar = rich.progress.Progress(
+            rich.progress.BarColumn(),
+            rich.progress.TaskProgressColumn(),
+            rich.progress.TimeElapsedColumn(),
+            rich.progress.TextColumn("{task.fields[remaining]}", style="#ADD8E6"),
+            rich.progress.TextColumn("{task.fields[open_delta]:>4}", style="#ADD8E6"),
+            rich.progress.TextColumn(" + "),
+            rich.progress.TextColumn("{task.fields[close_count]}", style="#808080"),
+        )
+        self.progress_bar_task = self.progress_bar.add_task(
+            "Crawling", start=True, remaining=""
+        )
+        self.current_path = rich.text.Text()
+        self.stragglers = rich.table.Table("Path", "Duration", title="Stragglers")
+        self.progress_path = rich.text.Text()
+        self.loads = rich.text.Text(style="#808080")
+        self.path_trackers = path_trackers
+        self.load_tracker = load_tracker
+        self._shown_stragglers: list[int] = []
+        super().__init__(
+            rich.console.Group(
+                self.progress_bar,
+                self.loads,
+                # self.current_path,
+                self.stragglers,
+                self.progress_path,
+            ),
+            console=console,
+            refresh_per_second=8,
+        )
+
+    def _remaining(self) -> str:
+        """Estimated remaining time, if all roots were crawled before"""
+        remaining = [x.remaining_ms for x in self.path_trackers]
+        if any(x is None for x in remaining):
+            return ""
+        minutes, seconds = divmod(max(x or 0 for x in remaining) // 1000, 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"~{hours}:{minutes:02}:{seconds:02} left"
+
+    def refresh(self) -> None:
+        if any(x.expected_total is not None for x in self.path_trackers):
+            # Weight progress by the entry counts of the previous crawl
+            total = sum(x.expected_total or x.open_count for x in self.path_trackers)
+            completed = sum(x.close_count for x in self.path_trackers)
+        else:
+            total = sum(len(x.opened_first_level) for x in self.path_trackers)
+            completed = sum(len(x.closed_first_level) for x in self.path_trackers)
+        self.progress_bar.update(
+            self.progress_bar_task,
+            total=total,
+            completed=completed,
+            open_delta=sum(x.open_delta for x in self.path_trackers),
+            close_count=sum(x.close_count for x in self.path_trackers),
+            remaining=self._remaining(),
+        )
+
+        self.current_path.truncate(0)
+        self.current_path.append(
+            "\n".join([str(s) for x in self.path_trackers for s in x.current_tree])
+        )
+        self._shown_stragglers += [0] * (
+            len(self.path_trackers) - len(self._shown_stragglers)
+        )
+        for index, path_tracker in enumerate(self.path_trackers):
+            new_stragglers = path_tracker.stragglers[self._shown_stragglers[index] :]
+            self._shown_stragglers[index] += len(new_stragglers)
+            for path, duration in new_stragglers:
+                if len(self.path_trackers) > 1:
+                    path = path_tracker.root / path
+                self.stragglers.add_row(str(path), str(duration))
+
+        self.loads.truncate(0)
+        now = time.time_ns() // (10**6)
+        self.loads.append(
+            "\n".join(
+                f"{name}: {((end or now) - start) / 1000:.1f}s"
+                + ("" if end is not None else " (loading)")
+                for name, (start, end) in list(self.load_tracker.loads.items())
+            )
+        )
+
+        self.progress_path.truncate(0)
+        self.progress_path.append(
+            "\n".join(
+                rich.markup.escape(str(x.last_opened))
+                for x in self.path_trackers
+                if x.last_opened is not None
+            )
+        )
+        return super().refresh()
@@ -1,23 +1,39 @@
 """Contains StatusTracker class"""
+from __future__ import annotations
+
 import time
-from contextlib import AbstractContextManager
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from pathlib import Path
 from types import TracebackType
+from typing import TYPE_CHECKING, Iterator
+
+from .census import CENSUS_DEPTH, Census, CensusEntry, load_census, update_census
+
+if TYPE_CHECKING:
+    import rich.console
+    from typing_extensions import Self
+
 
-import rich.console
-import rich.live
-import rich.markup
-import rich.text
-import rich.progress
-import rich.progress_bar
-import rich.table
-from typing_extensions import Self
+class _SubtreeCount:  # pylint: disable=R0903
+    """Entries found in a directory that is currently being crawled"""
+
+    def __init__(self, expected: CensusEntry | None) -> None:
+        self.entries = 0
+        self.expected = expected
+        # Difference to the census already accounted for, by subdirectories or
+        # by entries found beyond the census
+        self.corrected = 0
 
 
 class PathTracker:
     """Keep track of information about which paths have been checked and are still being checked"""
 
-    def __init__(self, root: Path, straggler_time_ms: int = 1_000) -> None:
+    def __init__(
+        self,
+        root: Path,
+        straggler_time_ms: int = 1_000,
+        census: Census | None = None,
+    ) -> None:
         self.root = root
         self.open_count = 0
         self.close_count = 0
@@ -30,6 +46,12 @@ class PathTracker:
         self.stragglers: list[tuple[Path, int]] = []
         self.straggler_time = straggler_time_ms
 
+        self.previous_census = census if census is not None else {}
+        self.census: Census = {}
+        self._subtree_counts: list[_SubtreeCount] = []
+        self.expected = self.previous_census.get(str(root.absolute()))
+        self.expected_count = self.expected.entries if self.expected else None
+
     def current_path(self, path: Path) -> None:
         """Event to current path"""
         relative_path = path.relative_to(self.root)
@@ -39,12 +61,26 @@ class PathTracker:
                 or relative_path.parent == self.current_tree[-1][0]
             )
             self.current_tree.append((relative_path, time.time_ns() // (10**6)))
+            self._subtree_counts.append(_SubtreeCount(self._expected_subtree(path)))
+
+    def _expected_subtree(self, path: Path) -> CensusEntry | None:
+        """Census of the directory that was just entered"""
+        if len(self.current_tree) > CENSUS_DEPTH + 1:
+            return None
+        expected = self.previous_census.get(str(path.absolute()))
+        if expected is None and self._subtree_counts:
+            if self._subtree_counts[-1].expected is not None:
+                # Parent was recorded, so this directory is new since then
+                return CensusEntry(0, 0)
+        return expected
 
     def open_paths(self, paths: list[Path]) -> None:
         """Event to open paths"""
         if not paths:
             return
         self.open_count += len(paths)
+        self._subtree_counts[-1].entries += len(paths)
+        self._correct_excess(self._subtree_counts[-1])
         self.last_opened = str(paths[-1])
         relative_path = paths[-1].relative_to(self.root)
 
@@ -63,75 +99,132 @@ class PathTracker:
                 time_delta -= straggler[1]
             if time_delta > self.straggler_time:
                 self.stragglers.append((relative_path, time_delta))
-            self.current_tree.pop()
+            self._close_subtree(path)
         if len(relative_path.parents) == 1:
             self.closed_first_level.append(path)
 
+    def _correct_excess(self, subtree: _SubtreeCount) -> None:
+        """Count entries beyond the census of a directory as soon as they are found"""
+        if subtree.expected is None:
+            return
+        excess = subtree.entries - subtree.expected.entries - subtree.corrected
+        if excess <= 0:
+            return
+        if self.expected_count is not None:
+            self.expected_count += excess
+        subtree.corrected += excess
+
+    def _close_subtree(self, path: Path) -> None:
+        """Record the finished directory, and correct the expected entry count"""
+        start_time = self.current_tree.pop()[1]
+        subtree = self._subtree_counts.pop()
+        parent = self._subtree_counts[-1]
+        parent.entries += subtree.entries
+
+        if len(self.current_tree) <= CENSUS_DEPTH:
+            self.census[str(path.absolute())] = CensusEntry(
+                subtree.entries, time.time_ns() // (10**6) - start_time
+            )
+        if subtree.expected is None:
+            parent.corrected += subtree.corrected
+        else:
+            difference = subtree.entries - subtree.expected.entries
+            if self.expected_count is not None:
+                self.expected_count += difference - subtree.corrected
+            parent.corrected += difference
+        self._correct_excess(parent)
+
+    def finish(self) -> None:
+        """Record the root, once crawling finished successfully"""
+        if not self.current_tree:
+            return
+        self.census[str(self.root.absolute())] = CensusEntry(
+            self._subtree_counts[0].entries,
+            time.time_ns() // (10**6) - self.current_tree[0][1],
+        )
+
     @property
     def open_delta(self) -> int:
         """Amount of paths that are currently being processed"""
         return self.open_count - self.close_count
 
+    @property
+    def expected_total(self) -> int | None:
+        """Expected amount of paths in the entire crawl, if it was crawled before"""
+        if self.expected_count is None:
+            return None
+        return max(self.expected_count, self.open_count)
 
-class PathTrackerDisplay(rich.live.Live):
-    """Progress display for crawling in directory using `PathTracker`"""
-
-    def __init__(self, path_tracker: PathTracker, console: rich.console.Console):
-        self.progress_bar = rich.progress.Progress(
-            rich.progress.BarColumn(),
-            rich.progress.TimeElapsedColumn(),
-            rich.progress.TextColumn("{task.fields[open_delta]:>4}", style="#ADD8E6"),
-            rich.progress.TextColumn(" + "),
-            rich.progress.TextColumn("{task.fields[close_count]}", style="#808080"),
-        )
-        self.progress_bar_task = self.progress_bar.add_task("Crawling", start=True)
-        self.current_path = rich.text.Text()
-        self.stragglers = rich.table.Table("Path", "Duration", title="Stragglers")
-        self.progress_path = rich.text.Text()
-        self.path_tracker = path_tracker
-        super().__init__(
-            rich.console.Group(
-                self.progress_bar,
-                # self.current_path,
-                self.stragglers,
-                self.progress_path,
-            ),
-            console=console,
-            refresh_per_second=8,
+    @property
+    def remaining_ms(self) -> int | None:
+        """Estimated time until the crawl is finished, if it was crawled before"""
+        total = self.expected_total
+        if self.expected is None or total is None or not self.current_tree:
+            return None
+        elapsed = time.time_ns() // (10**6) - self.current_tree[0][1]
+        fraction = self.close_count / total if total else 1.0
+        # Scale the previous duration by the corrected size, then trust the
+        # measured rate more the further along the crawl is
+        previous_estimate = (
+            self.expected.duration_ms * total / max(self.expected.entries, 1)
         )
+        live_estimate = elapsed / fraction if fraction else previous_estimate
+        estimate = (1 - fraction) * previous_estimate + fraction * live_estimate
+        return max(int(estimate) - elapsed, 0)
 
-    def refresh(self) -> None:
-        self.progress_bar.update(
-            self.progress_bar_task,
-            total=len(self.path_tracker.opened_first_level),
-            completed=len(self.path_tracker.closed_first_level),
-            open_delta=self.path_tracker.open_delta,
-            close_count=self.path_tracker.close_count,
-        )
 
-        self.current_path.truncate(0)
-        self.current_path.append(
-            "\n".join([str(s) for s in self.path_tracker.current_tree])
-        )
-        for straggler in self.path_tracker.stragglers[self.stragglers.row_count :]:
-            self.stragglers.add_row(*list(map(str, straggler)))
+class LoadTracker:
+    """Keep track of data that is loaded in the background while crawling"""
 
-        self.progress_path.truncate(0)
-        if self.path_tracker.last_opened is not None:
-            self.progress_path.append(
-                rich.markup.escape(str(self.path_tracker.last_opened))
-            )
-        return super().refresh()
+    def __init__(self) -> None:
+        # Start and end time in milliseconds, end is `None` while loading
+        self.loads: dict[str, tuple[int, int | None]] = {}
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Time the load happening inside the context"""
+        start = time.time_ns() // (10**6)
+        self.loads[name] = (start, None)
+        try:
+            yield
+        finally:
+            self.loads[name] = (start, time.time_ns() // (10**6))
 
 
 class TimingStatusTracker(AbstractContextManager["TimingStatusTracker"]):
     """Trackes status of crawling"""
 
-    def __init__(self, root: Path, console: rich.console.Console):
-        self.root = root
+    def __init__(
+        self,
+        console: rich.console.Console,
+        census_path: Path | None = None,
+    ):
+        self.roots: list[Path] = []
+        self.census_path = census_path
+        self.census = load_census(census_path) if census_path is not None else {}
+
+        # pylint: disable-next=C0415
+        from .progress_display import PathTrackerDisplay
+
+        # Filled by `crawl_roots`, shared with the display
+        self.path_trackers: list[PathTracker] = []
+        self.load_tracker = LoadTracker()
+        self.progress = PathTrackerDisplay(
+            self.path_trackers, self.load_tracker, console
+        )
 
-        self.path_tracker = PathTracker(root)
-        self.progress = PathTrackerDisplay(self.path_tracker, console)
+    def crawl_roots(self, roots: list[Path]) -> None:
+        """Event for the roots which are actually crawled"""
+        self.roots = roots
+        # Deepest roots first, a root may lie below a symlink in another root
+        self.path_trackers[:] = [
+            PathTracker(root, census=self.census)
+            for root in sorted(roots, key=lambda x: len(x.parts), reverse=True)
+        ]
+
+    def _tracker_for(self, path: Path) -> PathTracker:
+        """Find the tracker responsible for the given path"""
+        return next(x for x in self.path_trackers if path.is_relative_to(x.root))
 
     def __enter__(self) -> Self:
         self.progress.__enter__()
@@ -144,27 +237,39 @@ class TimingStatusTracker(AbstractContextManager["TimingStatusTracker"]):
         exc_tb: None | TracebackType,
     ) -> None:
         """Notify the status tracker, that crawling has stopped"""
-        self.path_tracker.last_opened = None
+        for path_tracker in self.path_trackers:
+            path_tracker.last_opened = None
         self.progress.__exit__(exc_type, exc_val, exc_tb)
+        if exc_type is None and self.census_path is not None:
+            census: Census = {}
+            for path_tracker in self.path_trackers:
+                path_tracker.finish()
+                census.update(path_tracker.census)
+            update_census(self.census_path, census, self.roots)
 
     def current_path(self, path: Path) -> None:
         """Event for recursing into path"""
-        self.path_tracker.current_path(path)
+        self._tracker_for(path).current_path(path)
 
     def open_paths(self, paths: list[Path]) -> None:
         """Event to open paths"""
-        self.path_tracker.open_paths(paths)
+        if paths:
+            self._tracker_for(paths[0]).open_paths(paths)
 
     def close_path(self, path: Path) -> None:
         """Event to close path"""
-        self.path_tracker.close_path(path)
+        self._tracker_for(path).close_path(path)
+
+    def track_load(self, name: str) -> AbstractContextManager[None]:
+        """Event for loading data in the background"""
+        return self.load_tracker.track(name)
 
 
 class VoidStatusTracker:
     """Provides tracker interface, outputs nothing"""
 
-    def __init__(self, path: Path):
-        pass
+    def crawl_roots(self, roots: list[Path]) -> None:
+        """Event for the roots which are actually crawled"""
 
     def current_path(self, path: Path) -> None:
         """Event for recursing into path"""
@@ -175,6 +280,10 @@ class VoidStatusTracker:
     def close_path(self, path: Path) -> None:
         """Prints current status"""
 
+    def track_load(self, name: str) -> AbstractContextManager[None]:
+        """Event for loading data in the background"""
+        return nullcontext()
+
     def __enter__(self) -> Self:
         return self
 
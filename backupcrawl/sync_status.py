@@ -1,9 +1,15 @@
 """Contains SyncStatus class"""
+from __future__ import annotations
+
 import enum
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 import abc
 
+if TYPE_CHECKING:
+    from .statustracker import StatusTracker
+
 
 class SyncStatus(enum.Enum):
     """Different backup states"""
@@ -35,6 +41,12 @@ class DirChecker(abc.ABC):
         """Check if directory is backed up"""
         raise NotImplementedError()
 
+    def prefetch(self, status: StatusTracker) -> None:
+        """Start loading data needed by the checks in the background"""
+
+    def close(self) -> None:
+        """Stop background work started by `prefetch`"""
+
 
 class FileChecker(abc.ABC):
     """Abstract base class for checking the backup status of a file"""
@@ -43,3 +55,13 @@ class FileChecker(abc.ABC):
     def check_file(self, filepath: Path) -> BackupEntry:
         """Check if file is backed up"""
         raise NotImplementedError()
+
+    def ready(self) -> bool:
+        """Whether `check_file` answers without waiting for data loaded in the background"""
+        return True
+
+    def prefetch(self, status: StatusTracker) -> None:
+        """Start loading data needed by the checks in the background"""
+
+    def close(self) -> None:
+        """Stop background work started by `prefetch`"""
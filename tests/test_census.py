@@ -0,0 +1,28 @@
+"""Tests for storing the census"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from backupcrawl.census import CensusEntry, load_census, update_census
+
+
+class CensusTest(unittest.TestCase):
+    """Storing and loading the census"""
+
+    def test_update_replaces_crawled_roots(self) -> None:
+        """Entries below crawled roots are replaced, others are kept"""
+        with tempfile.TemporaryDirectory() as census_dir:
+            census_path = Path(census_dir) / "census.json"
+            update_census(
+                census_path,
+                {"/a": CensusEntry(3, 10), "/a/old": CensusEntry(1, 1)},
+                [Path("/a")],
+            )
+            update_census(census_path, {"/b": CensusEntry(5, 20)}, [Path("/b")])
+            update_census(census_path, {"/a": CensusEntry(4, 12)}, [Path("/a")])
+
+            self.assertEqual(
+                load_census(census_path),
+                {"/a": CensusEntry(4, 12), "/b": CensusEntry(5, 20)},
+            )
+            self.assertEqual(list(Path(census_dir).iterdir()), [census_path])
@@ -0,0 +1,204 @@
+"""Tests for combining crawl results"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from backupcrawl.crawlresult import CrawlAccumulator, CrawlResult, MultiCrawlResult
+from backupcrawl import crawler
+from backupcrawl.sync_status import BackupEntry, SyncStatus
+
+
+def _no_alias(key: tuple[int, int]) -> Path:
+    raise AssertionError(f"Unexpected alias {key}")
+
+
+class CrawlAccumulatorTest(unittest.TestCase):
+    """Building results from the flat accumulator"""
+
+    def _build_tree(self) -> CrawlAccumulator:
+        """/r/top, /r/plain/{x,deep/y}, /r/mixed/{z,repo(backup),sub/w}"""
+        result = CrawlAccumulator(Path("/r"))
+        root = CrawlAccumulator.ROOT
+        result.add_loose(result.add_node(root, "top"))
+        plain = result.add_node(root, "plain")
+        result.add_loose(result.add_node(plain, "x"))
+        deep = result.add_node(plain, "deep")
+        result.add_loose(result.add_node(deep, "y"))
+        mixed = result.add_node(root, "mixed")
+        result.add_loose(result.add_node(mixed, "z"))
+        repo = result.add_node(mixed, "repo")
+        result.add_backup(repo, BackupEntry(Path("/r/mixed/repo"), SyncStatus.CLEAN))
+        sub = result.add_node(mixed, "sub")
+        result.add_loose(result.add_node(sub, "w"))
+        return result
+
+    def test_collapse_target(self) -> None:
+        """Loose entries collapse into their topmost backup free ancestor"""
+        result = self._build_tree()
+        targets: dict[int, int] = {}
+        # pylint: disable=W0212
+        collapsed = [
+            result.path(result._collapse_target(node, targets))
+            for node in result._loose
+        ]
+        self.assertEqual(
+            collapsed,
+            [
+                Path("/r/top"),
+                Path("/r/plain"),
+                Path("/r/plain"),
+                Path("/r/mixed/z"),
+                Path("/r/mixed/sub"),
+            ],
+        )
+
+    def test_result_matches_extend_chain(self) -> None:
+        """The accumulator gives the same result as extending per directory"""
+        deep = CrawlResult(Path("/r/plain/deep"))
+        deep.loose_paths.append(Path("/r/plain/deep/y"))
+        plain = CrawlResult(Path("/r/plain"))
+        plain.loose_paths.append(Path("/r/plain/x"))
+        plain.extend(deep)
+        repo = CrawlResult(Path("/r/mixed/repo"))
+        repo.add_backup(BackupEntry(Path("/r/mixed/repo"), SyncStatus.CLEAN))
+        sub = CrawlResult(Path("/r/mixed/sub"))
+        sub.loose_paths.append(Path("/r/mixed/sub/w"))
+        mixed = CrawlResult(Path("/r/mixed"))
+        mixed.loose_paths.append(Path("/r/mixed/z"))
+        mixed.extend(repo)
+        mixed.extend(sub)
+        expected = CrawlResult(Path("/r"))
+        expected.loose_paths.append(Path("/r/top"))
+        expected.extend(plain)
+        expected.extend(mixed)
+
+        crawl_result = self._build_tree().result(_no_alias)
+
+        self.assertEqual(
+            crawl_result.loose_paths,
+            [
+                Path("/r/top"),
+                Path("/r/plain"),
+                Path("/r/mixed/z"),
+                Path("/r/mixed/sub"),
+            ],
+        )
+        self.assertEqual(crawl_result.loose_paths, expected.loose_paths)
+        self.assertEqual(crawl_result.backups, expected.backups)
+
+    def test_graft_moves_directory_to_alias(self) -> None:
+        """A grafted directory is reported in crawl order at the alias"""
+        first = CrawlAccumulator(Path("/a"))
+        first.add_loose(first.add_node(CrawlAccumulator.ROOT, "f0"))
+        alias = first.add_node(CrawlAccumulator.ROOT, "m")
+        first.add_alias(alias, (1, 2))
+        first.add_loose(
+            first.add_node(first.add_node(CrawlAccumulator.ROOT, "z"), "f1")
+        )
+        second = CrawlAccumulator(Path("/b"))
+        crawled = second.add_node(CrawlAccumulator.ROOT, "k")
+        second.add_loose(second.add_node(crawled, "f"))
+        second.add_backup(crawled, BackupEntry(Path("/b/k/g"), SyncStatus.CLEAN))
+        second.add_loose(second.add_node(CrawlAccumulator.ROOT, "own"))
+
+        moved = first.graft(alias, (1, 2), second, crawled)
+        first_result = first.result(_no_alias)
+        second_result = second.result(lambda key: first.path(moved[crawled]))
+
+        self.assertEqual(
+            first_result.loose_paths, [Path("/a/f0"), Path("/a/m/f"), Path("/a/z")]
+        )
+        self.assertEqual(len(first_result.backups[BackupEntry]), 1)
+        self.assertEqual(first_result.aliases, [])
+        self.assertEqual(second_result.loose_paths, [Path("/b/own")])
+        self.assertEqual(second_result.aliases, [(Path("/b/k"), Path("/a/m"))])
+        self.assertFalse(second_result.backups)
+
+
+class MultiCrawlResultTest(unittest.TestCase):
+    """Merging the results of several roots"""
+
+    def test_merged_mixed_relative_roots(self) -> None:
+        """Relative and absolute roots share an absolute common root"""
+        relative_root = Path("a")
+        absolute_root = Path.cwd() / "d"
+        relative_result = CrawlResult(relative_root)
+        relative_result.loose_paths.append(relative_root / "x")
+        absolute_result = CrawlResult(absolute_root)
+        absolute_result.loose_paths.append(absolute_root / "y")
+
+        merged = MultiCrawlResult(
+            {relative_root: relative_result, absolute_root: absolute_result}
+        ).merged()
+
+        self.assertEqual(merged.path, Path.cwd())
+        self.assertEqual(merged.loose_paths, [Path("a/x"), absolute_root / "y"])
+
+
+class ScanRootsTest(unittest.TestCase):
+    """Scanning several overlapping roots"""
+
+    def setUp(self) -> None:
+        self._tree = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.tree = Path(self._tree.name)
+        (self.tree / "a" / "nested").mkdir(parents=True)
+        (self.tree / "b").mkdir()
+        (self.tree / "elsewhere").mkdir()
+        os.symlink(self.tree / "elsewhere", self.tree / "a" / "link")
+
+    def tearDown(self) -> None:
+        self._tree.cleanup()
+
+    def test_duplicate_roots(self) -> None:
+        """A root given twice is crawled once"""
+        root = self.tree / "a"
+        roots, covered = crawler._deduplicate_roots(  # pylint: disable=W0212
+            [root, root, self.tree / "b"]
+        )
+        self.assertEqual(roots, [root, self.tree / "b"])
+        self.assertEqual(covered, {})
+
+    def test_nested_roots(self) -> None:
+        """A root inside another root is covered by it"""
+        nested = self.tree / "a" / "nested"
+        roots, covered = crawler._deduplicate_roots(  # pylint: disable=W0212
+            [nested, self.tree / "a"]
+        )
+        self.assertEqual(roots, [self.tree / "a"])
+        self.assertEqual(covered, {nested: self.tree / "a"})
+
+    def test_root_below_symlink(self) -> None:
+        """A root reached through a symlink is covered by its resolved location"""
+        linked = self.tree / "a" / "link"
+        roots, covered = crawler._deduplicate_roots(  # pylint: disable=W0212
+            [self.tree / "a", linked, self.tree / "elsewhere"]
+        )
+        self.assertEqual(roots, [self.tree / "a", linked])
+        self.assertEqual(covered, {self.tree / "elsewhere": linked})
+
+    def test_scan_results_per_kept_root(self) -> None:
+        """Scanning returns a result per crawled root, and lists covered roots"""
+        nested = self.tree / "a" / "nested"
+        crawl_result = crawler.scan([self.tree / "a", nested, self.tree / "b"])
+
+        self.assertEqual(list(crawl_result.results), [self.tree / "a", self.tree / "b"])
+        self.assertEqual(crawl_result.results[self.tree / "a"].path, self.tree / "a")
+        self.assertEqual(crawl_result.covered_roots, {nested: self.tree / "a"})
+
+    def test_ignore_relative_root(self) -> None:
+        """Ignore patterns match entries without the leading "./" of the root"""
+        previous_cwd = Path.cwd()
+        os.chdir(self.tree)
+        try:
+            found_files, recurse_dirs = (
+                crawler._filter_directory(  # pylint: disable=W0212
+                    Path("."), CrawlAccumulator.ROOT, ["a"], CrawlAccumulator(Path("."))
+                )
+            )
+        finally:
+            os.chdir(previous_cwd)
+
+        self.assertEqual(found_files, [])
+        self.assertEqual(sorted(recurse_dirs), [Path("b"), Path("elsewhere")])
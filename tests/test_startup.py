@@ -0,0 +1,27 @@
+"""Checks the import budget of the JSON output path"""
+import subprocess
+import sys
+import unittest
+
+_CHECK_IMPORTS = """
+import sys
+import backupcrawl.__main__
+heavy = sorted(
+    x for x in sys.modules if x.split(".")[0] in ("rich", "typing_extensions")
+)
+print(",".join(heavy))
+"""
+
+
+class StartupTest(unittest.TestCase):
+    """The JSON output path must not import the console dependencies"""
+
+    def test_main_imports_no_rich(self) -> None:
+        """Importing the entry point leaves rich and typing_extensions unloaded"""
+        check_process = subprocess.run(
+            [sys.executable, "-c", _CHECK_IMPORTS],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(check_process.stdout.strip(), "")
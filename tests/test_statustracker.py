@@ -0,0 +1,57 @@
+"""Tests for estimating the progress of a crawl"""
+import unittest
+from pathlib import Path
+
+from backupcrawl.census import CensusEntry
+from backupcrawl.statustracker import PathTracker
+
+ROOT = Path("/r")
+
+
+class PathTrackerTest(unittest.TestCase):
+    """Correcting the expected entry count with the census"""
+
+    def test_excess_counts_immediately(self) -> None:
+        """Entries beyond the census raise the expected count once they are found"""
+        tracker = PathTracker(ROOT, census={"/r": CensusEntry(2, 10)})
+        tracker.current_path(ROOT)
+        tracker.open_paths([ROOT / f"f{index}" for index in range(5)])
+
+        self.assertEqual(tracker.expected_count, 5)
+
+    def test_new_directory_counts_immediately(self) -> None:
+        """Entries of a directory missing from the census are all excess"""
+        tracker = PathTracker(ROOT, census={"/r": CensusEntry(1, 10)})
+        tracker.current_path(ROOT)
+        tracker.open_paths([ROOT / "new"])
+        tracker.current_path(ROOT / "new")
+        tracker.open_paths([ROOT / "new" / "a", ROOT / "new" / "b"])
+
+        self.assertEqual(tracker.expected_count, 3)
+
+    def test_excess_is_not_counted_twice(self) -> None:
+        """Closing a directory only adds what was not counted while crawling it"""
+        census = {"/r": CensusEntry(10, 10), "/r/sub": CensusEntry(8, 5)}
+        tracker = PathTracker(ROOT, census=census)
+        tracker.current_path(ROOT)
+        tracker.open_paths([ROOT / "sub", ROOT / "f"])
+        tracker.current_path(ROOT / "sub")
+        tracker.open_paths([ROOT / "sub" / f"f{index}" for index in range(10)])
+        self.assertEqual(tracker.expected_count, 12)
+
+        tracker.close_path(ROOT / "sub")
+        self.assertEqual(tracker.expected_count, 12)
+        self.assertEqual(tracker.census["/r/sub"].entries, 10)
+
+    def test_shrunk_directory_corrected_on_close(self) -> None:
+        """Missing entries are only known once the directory is closed"""
+        census = {"/r": CensusEntry(10, 10), "/r/sub": CensusEntry(8, 5)}
+        tracker = PathTracker(ROOT, census=census)
+        tracker.current_path(ROOT)
+        tracker.open_paths([ROOT / "sub", ROOT / "f"])
+        tracker.current_path(ROOT / "sub")
+        tracker.open_paths([ROOT / "sub" / "a", ROOT / "sub" / "b", ROOT / "sub" / "c"])
+        self.assertEqual(tracker.expected_count, 10)
+
+        tracker.close_path(ROOT / "sub")
+        self.assertEqual(tracker.expected_count, 5)